@@ -1,15 +1,80 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px 
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from scipy import stats
 import warnings
 warnings.filterwarnings('ignore')
 
 from data_analysis import DataAnalyzer
-from visualization import HygieneVisualizer
+
+# Low-cardinality columns stored as categories (Oui/Non/Inconnu answers and descriptors)
+CATEGORICAL_COLUMNS = [
+    'Localisation', 'Type _de_produit', 'Effectif_du_personnel',
+    'Existence_BPH', 'Existence_BPF', 'Existence_HACCP',
+    'Procedures_ecrites', 'Formation_du_personnel_en_hygiene',
+    'Hygiene_du_personnel', 'Hygiene_des_locaux',
+    'Stockage_des_matieres_premieres', 'Controle_qualite_regulier',
+    'Obstacle_technique', 'Obstacle_financier',
+    'Obstacle_organisationnel', 'Obstacle_humain'
+]
+
+# Cached analysis helpers: the data is static, so results are reused across reruns
+@st.cache_resource
+def get_analyzer(df):
+    return DataAnalyzer(df)
+
+@st.cache_resource
+def get_visualizer(df):
+    # Imported here so plotly is only loaded by the sections that draw figures
+    from visualization import HygieneVisualizer
+    
+    return HygieneVisualizer(df, analyzer=get_analyzer(df))
+
+@st.cache_data
+def get_hygiene_statistics(df):
+    return get_analyzer(df).calculate_hygiene_statistics()
+
+@st.cache_data
+def get_staff_statistics(df):
+    return get_analyzer(df).calculate_staff_statistics()
+
+@st.cache_data
+def get_obstacles_statistics(df):
+    return get_analyzer(df).analyze_obstacles()
+
+@st.cache_data
+def get_specific_obstacles(df):
+    return get_analyzer(df).analyze_specific_obstacles()
+
+@st.cache_data
+def get_training_statistics(df):
+    return get_analyzer(df).analyze_training()
+
+@st.cache_data
+def get_company_radar(df, company_id):
+    return get_visualizer(df).create_company_radar(company_id)
+
+@st.cache_data
+def get_obstacles_chart(df):
+    return get_visualizer(df).create_obstacles_chart()
+
+@st.cache_data
+def get_training_chart(df):
+    return get_visualizer(df).create_training_chart()
+
+@st.cache_data
+def get_training_correlation_heatmap(df):
+    return get_visualizer(df).create_training_correlation_heatmap()
+
+@st.cache_data
+def get_company_comparison_chart(df):
+    return get_visualizer(df).create_company_comparison_chart()
+
+@st.cache_data
+def get_hygiene_boxplot(df):
+    return get_visualizer(df).create_hygiene_boxplot()
+
+@st.cache_data
+def get_product_type_analysis(df):
+    return get_visualizer(df).create_product_type_analysis()
 
 def main():
     st.set_page_config( 
@@ -26,21 +91,25 @@ def main():
     @st.cache_data
     def load_data():
         try:
-            df = pd.read_csv('attached_assets/data_1757344901533.csv', encoding='utf-8-sig')
-            return df
+            path = 'attached_assets/data_1757344901533.csv'
+            dtype = {col: 'category' for col in CATEGORICAL_COLUMNS}
+            try:
+                df = pd.read_csv(path, encoding='utf-8-sig', engine='pyarrow', dtype=dtype)
+            except (ImportError, ValueError):  # pyarrow unavailable, fall back to the C parser
+                df = pd.read_csv(path, encoding='utf-8-sig', dtype=dtype)
+            
+            # Share of "Inconnu" cells, computed once with the cached data
+            missing_rate = df.isin(["Inconnu"]).to_numpy().sum() / (df.shape[0] * df.shape[1]) * 100
+            return df, missing_rate
         except Exception as e:
             st.error(f"Erreur lors du chargement des données: {e}")
-            return None
+            return None, None
     
-    df = load_data()
+    df, missing_rate = load_data()
     
     if df is None:
         st.stop()
     
-    # Initialize analyzers
-    analyzer = DataAnalyzer(df)
-    visualizer = HygieneVisualizer(df)
-    
     # Sidebar for navigation
     st.sidebar.title("🔍 Navigation")
     section = st.sidebar.radio(
@@ -50,19 +119,21 @@ def main():
     )
     
     if section == "Vue d'ensemble":
-        show_overview(df, analyzer)
+        show_overview(df, missing_rate)
     elif section == "Statistiques descriptives":
-        show_descriptive_stats(analyzer)
+        show_descriptive_stats(df)
     elif section == "Visualisations par entreprise":
-        show_company_analysis(df, visualizer)
+        show_company_analysis(df)
     elif section == "Analyse des obstacles":
-        show_obstacles_analysis(analyzer, visualizer)
+        show_obstacles_analysis(df)
     elif section == "Analyse des formations":
-        show_training_analysis(analyzer, visualizer)
+        show_training_analysis(df)
     elif section == "Comparaisons inter-entreprises":
-        show_comparative_analysis(visualizer)
+        show_comparative_analysis(df)
 
-def show_overview(df, analyzer):
+def show_overview(df, missing_rate):
+    import plotly.express as px
+    
     st.header("📋 Vue d'ensemble des données")
     
     col1, col2, col3, col4 = st.columns(4)
@@ -77,7 +148,6 @@ def show_overview(df, analyzer):
         st.metric("Types de produits", len(df['Type _de_produit'].unique()))
     
     with col4:
-        missing_rate = (df == "Inconnu").sum().sum() / (df.shape[0] * df.shape[1]) * 100
         st.metric("Taux de données manquantes", f"{missing_rate:.1f}%")
     
     st.subheader("Aperçu des données")
@@ -88,14 +158,14 @@ def show_overview(df, analyzer):
     fig = px.bar(x=product_dist.values, y=product_dist.index, 
                  orientation='h', title="Répartition par type de produit")
     fig.update_layout(yaxis={'categoryorder':'total ascending'})
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, use_container_width=True, theme=None)
 
-def show_descriptive_stats(analyzer):
+def show_descriptive_stats(df):
     st.header("📈 Statistiques descriptives")
     
     # Hygiene practices statistics
     st.subheader("Statistiques des pratiques d'hygiène")
-    hygiene_stats = analyzer.calculate_hygiene_statistics()
+    hygiene_stats = get_hygiene_statistics(df)
     
     for practice, stats_dict in hygiene_stats.items():
         with st.expander(f"📊 {practice}"):
@@ -114,7 +184,7 @@ def show_descriptive_stats(analyzer):
     
     # Staff size statistics
     st.subheader("Distribution de l'effectif du personnel")
-    staff_stats = analyzer.calculate_staff_statistics()
+    staff_stats = get_staff_statistics(df)
     
     col1, col2 = st.columns(2)
     with col1:
@@ -131,14 +201,14 @@ def show_descriptive_stats(analyzer):
         for category, ci in staff_stats['confidence_intervals'].items():
             st.write(f"- {category}: [{ci[0]:.3f}, {ci[1]:.3f}]")
 
-def show_company_analysis(df, visualizer):
+def show_company_analysis(df):
     st.header("🏭 Analyse par entreprise")
     
     companies = sorted(df['ID_entreprise'].unique())
     selected_company = st.selectbox("Sélectionner une entreprise:", companies)
     
     if selected_company:
-        company_data = df[df['ID_entreprise'] == selected_company].iloc[0]
+        company_data = get_visualizer(df).get_company_data(selected_company)
         
         col1, col2 = st.columns(2)
         
@@ -151,8 +221,8 @@ def show_company_analysis(df, visualizer):
         
         with col2:
             st.subheader("Profil radar des pratiques d'hygiène")
-            radar_fig = visualizer.create_company_radar(selected_company)
-            st.plotly_chart(radar_fig, use_container_width=True)
+            radar_fig = get_company_radar(df, selected_company)
+            st.plotly_chart(radar_fig, use_container_width=True, theme=None)
         
         st.subheader("Détail des pratiques d'hygiène")
         hygiene_practices = [
@@ -162,38 +232,28 @@ def show_company_analysis(df, visualizer):
             'Stockage_des_matieres_premieres', 'Controle_qualite_regulier'
         ]
         
-        practice_data = []
-        for practice in hygiene_practices:
-            value = company_data[practice]
-            if value == "Oui":
-                status = "✅ Conforme"
-                color = "green"
-            elif value == "Non":
-                status = "❌ Non conforme"
-                color = "red"
-            else:
-                status = "❓ Inconnu"
-                color = "orange"
-            
-            practice_data.append({
-                'Pratique': practice.replace('_', ' ').title(),
-                'Statut': status
-            })
+        status_map = {'Oui': "✅ Conforme", 'Non': "❌ Non conforme"}
+        statuses = company_data[hygiene_practices].map(status_map).fillna("❓ Inconnu")
         
-        practice_df = pd.DataFrame(practice_data)
-        st.dataframe(practice_df, use_container_width=True)
+        practice_df = pd.DataFrame({
+            'Pratique': [practice.replace('_', ' ').title() for practice in hygiene_practices],
+            'Statut': statuses.values
+        })
+        st.table(practice_df)
 
-def show_obstacles_analysis(analyzer, visualizer):
+def show_obstacles_analysis(df):
+    import plotly.express as px
+    
     st.header("🚧 Analyse des obstacles")
     
-    obstacles_stats = analyzer.analyze_obstacles()
+    obstacles_stats = get_obstacles_statistics(df)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Fréquence des obstacles")
-        fig = visualizer.create_obstacles_chart()
-        st.plotly_chart(fig, use_container_width=True)
+        fig = get_obstacles_chart(df)
+        st.plotly_chart(fig, use_container_width=True, theme=None)
     
     with col2:
         st.subheader("Statistiques des obstacles")
@@ -204,7 +264,7 @@ def show_obstacles_analysis(analyzer, visualizer):
                 st.write(f"**IC 95%:** [{ci[0]:.3f}, {ci[1]:.3f}]")
     
     st.subheader("Analyse détaillée des obstacles spécifiques")
-    specific_obstacles = analyzer.analyze_specific_obstacles()
+    specific_obstacles = get_specific_obstacles(df)
     
     if specific_obstacles:
         fig = px.bar(
@@ -214,19 +274,19 @@ def show_obstacles_analysis(analyzer, visualizer):
             title="Fréquence des obstacles spécifiques mentionnés"
         )
         fig.update_layout(yaxis={'categoryorder':'total ascending'})
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None)
 
-def show_training_analysis(analyzer, visualizer):
+def show_training_analysis(df):
     st.header("🎓 Analyse des formations")
     
-    training_stats = analyzer.analyze_training()
+    training_stats = get_training_statistics(df)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Distribution des formations")
-        fig = visualizer.create_training_chart()
-        st.plotly_chart(fig, use_container_width=True)
+        fig = get_training_chart(df)
+        st.plotly_chart(fig, use_container_width=True, theme=None)
     
     with col2:
         st.subheader("Statistiques des formations")
@@ -237,23 +297,23 @@ def show_training_analysis(analyzer, visualizer):
                 st.write(f"**IC 95%:** [{ci[0]:.3f}, {ci[1]:.3f}]")
     
     st.subheader("Corrélation formation-pratiques")
-    correlation_fig = visualizer.create_training_correlation_heatmap()
-    st.plotly_chart(correlation_fig, use_container_width=True)
+    correlation_fig = get_training_correlation_heatmap(df)
+    st.plotly_chart(correlation_fig, use_container_width=True, theme=None)
 
-def show_comparative_analysis(visualizer):
+def show_comparative_analysis(df):
     st.header("⚖️ Comparaisons inter-entreprises")
     
     st.subheader("Comparaison des scores d'hygiène par entreprise")
-    comparison_fig = visualizer.create_company_comparison_chart()
-    st.plotly_chart(comparison_fig, use_container_width=True)
+    comparison_fig = get_company_comparison_chart(df)
+    st.plotly_chart(comparison_fig, use_container_width=True, theme=None)
     
     st.subheader("Boxplot des pratiques d'hygiène")
-    boxplot_fig = visualizer.create_hygiene_boxplot()
-    st.plotly_chart(boxplot_fig, use_container_width=True)
+    boxplot_fig = get_hygiene_boxplot(df)
+    st.plotly_chart(boxplot_fig, use_container_width=True, theme=None)
     
     st.subheader("Analyse par type de produit")
-    product_analysis_fig = visualizer.create_product_type_analysis()
-    st.plotly_chart(product_analysis_fig, use_container_width=True)
+    product_analysis_fig = get_product_type_analysis(df)
+    st.plotly_chart(product_analysis_fig, use_container_width=True, theme=None)
 
 if __name__ == "__main__":
     main()
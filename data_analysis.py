@@ -1,11 +1,50 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
-import re
+
+def encode_hygiene_answers(df, practices):
+    """Encode practice answers as an int8 matrix: 1 = Oui, 0 = other known answer, -1 = unknown"""
+    practices = [practice for practice in practices if practice in df.columns]
+    values = df[practices]
+    
+    known = values.notna() & values.ne('Inconnu')
+    yes = values.eq('Oui')
+    
+    return np.where(known.to_numpy(), yes.to_numpy(), -1).astype(np.int8)
+
+def compute_hygiene_scores(codes):
+    """Compute the composite hygiene score of every row (share of 'Oui' among known answers)"""
+    known = (codes >= 0).sum(axis=1)
+    yes = (codes == 1).sum(axis=1)
+    
+    scores = np.zeros(codes.shape[0])
+    np.divide(yes, known, out=scores, where=known > 0)
+    return scores
+
+def compute_training_masks(training, training_types=('BPH', 'BPF', 'HACCP', 'Aucune')):
+    """Flag, for every row, the training types mentioned in the 'Formation_reçue' text"""
+    training = training.astype(str)
+    return pd.DataFrame(
+        {training_type: training.str.contains(training_type, regex=False, na=False) for training_type in training_types},
+        index=training.index
+    )
+
+def _wilson_intervals(counts, totals, z=1.96):
+    """Wilson score confidence intervals (95% by default) of several proportions in one vectorized call"""
+    counts = np.asarray(counts, dtype=float)
+    totals = np.broadcast_to(np.asarray(totals, dtype=float), counts.shape)
+    
+    proportions = counts / totals
+    denominator = 1 + z * z / totals
+    center = (proportions + z * z / (2 * totals)) / denominator
+    half_width = z * np.sqrt(proportions * (1 - proportions) / totals + z * z / (4 * totals * totals)) / denominator
+    
+    ci_lower = np.clip(center - half_width, 0.0, 1.0)
+    ci_upper = np.clip(center + half_width, 0.0, 1.0)
+    return list(zip(ci_lower.tolist(), ci_upper.tolist()))
 
 class DataAnalyzer:
     def __init__(self, df):
-        self.df = df.copy()
+        self.df = df
         self.hygiene_practices = [
             'Existence_BPH', 'Existence_BPF', 'Existence_HACCP',
             'Procedures_ecrites', 'Formation_du_personnel_en_hygiene',
@@ -16,41 +55,39 @@ class DataAnalyzer:
             'Obstacle_technique', 'Obstacle_financier', 
             'Obstacle_organisationnel', 'Obstacle_humain'
         ]
+        
+        # Practice answers encoded once, reused by every score computation
+        self.hygiene_codes = encode_hygiene_answers(df, self.hygiene_practices)
     
     def calculate_hygiene_statistics(self):
         """Calculate descriptive statistics for hygiene practices"""
-        results = {}
+        practices = [practice for practice in self.hygiene_practices if practice in self.df.columns]
+        values = ['Oui', 'Non', 'Inconnu']
+        total = len(self.df)
         
-        for practice in self.hygiene_practices:
-            if practice in self.df.columns:
-                # Count occurrences
-                value_counts = self.df[practice].value_counts()
-                total = len(self.df[practice])
-                
-                # Calculate proportions and confidence intervals
-                stats_dict = {}
-                confidence_intervals = {}
-                
-                for value in ['Oui', 'Non', 'Inconnu']:
-                    count = value_counts.get(value, 0)
-                    proportion = count / total
-                    
-                    # Exact binomial confidence interval
-                    if count > 0:
-                        ci_lower, ci_upper = stats.binom.interval(0.95, total, proportion)
-                        ci_lower = ci_lower / total
-                        ci_upper = ci_upper / total
-                    else:
-                        ci_lower = ci_upper = 0.0
-                    
-                    stats_dict[value] = {
-                        'count': count,
-                        'proportion': proportion
-                    }
-                    confidence_intervals[value] = (ci_lower, ci_upper)
-                
-                stats_dict['confidence_intervals'] = confidence_intervals
-                results[practice] = stats_dict
+        # Count occurrences
+        counts = {}
+        for practice in practices:
+            value_counts = self.df[practice].value_counts()
+            counts[practice] = [value_counts.get(value, 0) for value in values]
+        
+        # Wilson score confidence intervals of every practice/value pair at once
+        intervals = iter(_wilson_intervals([count for practice in practices for count in counts[practice]], total))
+        
+        results = {}
+        for practice in practices:
+            stats_dict = {}
+            confidence_intervals = {}
+            
+            for value, count in zip(values, counts[practice]):
+                stats_dict[value] = {
+                    'count': count,
+                    'proportion': count / total
+                }
+                confidence_intervals[value] = next(intervals)
+            
+            stats_dict['confidence_intervals'] = confidence_intervals
+            results[practice] = stats_dict
         
         return results
     
@@ -62,7 +99,7 @@ class DataAnalyzer:
             '20 à 30': 25
         }
         
-        staff_numeric = self.df['Effectif_du_personnel'].map(staff_mapping).dropna()
+        staff_numeric = pd.to_numeric(self.df['Effectif_du_personnel'].map(staff_mapping)).dropna()
         
         if len(staff_numeric) == 0:
             return {}
@@ -83,24 +120,19 @@ class DataAnalyzer:
         # Confidence intervals for proportions of each category
         staff_counts = self.df['Effectif_du_personnel'].value_counts()
         total = len(self.df['Effectif_du_personnel'])
-        confidence_intervals = {}
-        
-        for category, count in staff_counts.items():
-            proportion = count / total
-            if count > 0:
-                ci_lower, ci_upper = stats.binom.interval(0.95, total, proportion)
-                ci_lower = ci_lower / total
-                ci_upper = ci_upper / total
-            else:
-                ci_lower = ci_upper = 0.0
-            confidence_intervals[category] = (ci_lower, ci_upper)
+        confidence_intervals = dict(zip(
+            staff_counts.index,
+            _wilson_intervals(staff_counts.values, total)
+        ))
         
         stats_dict['confidence_intervals'] = confidence_intervals
         return stats_dict
     
     def analyze_obstacles(self):
         """Analyze obstacles faced by companies"""
-        results = {}
+        obstacles = []
+        counts = []
+        totals = []
         
         for obstacle_col in self.obstacle_columns:
             if obstacle_col in self.df.columns:
@@ -109,103 +141,78 @@ class DataAnalyzer:
                 total_responses = len(self.df[obstacle_col][self.df[obstacle_col].isin(['Oui', 'Non'])])
                 
                 if total_responses > 0:
-                    yes_count = value_counts.get('Oui', 0)
-                    proportion = yes_count / total_responses
-                    
-                    # Exact binomial confidence interval
-                    if yes_count > 0:
-                        ci_lower, ci_upper = stats.binom.interval(0.95, total_responses, proportion)
-                        ci_lower = ci_lower / total_responses
-                        ci_upper = ci_upper / total_responses
-                    else:
-                        ci_lower = ci_upper = 0.0
-                    
-                    results[obstacle_col] = {
-                        'count': yes_count,
-                        'total': total_responses,
-                        'proportion': proportion,
-                        'confidence_interval': (ci_lower, ci_upper)
-                    }
+                    obstacles.append(obstacle_col)
+                    counts.append(value_counts.get('Oui', 0))
+                    totals.append(total_responses)
         
-        return results
+        if not obstacles:
+            return {}
+        
+        # Wilson score confidence intervals
+        intervals = _wilson_intervals(counts, totals)
+        
+        return {
+            obstacle_col: {
+                'count': yes_count,
+                'total': total_responses,
+                'proportion': yes_count / total_responses,
+                'confidence_interval': interval
+            }
+            for obstacle_col, yes_count, total_responses, interval in zip(obstacles, counts, totals, intervals)
+        }
     
     def analyze_specific_obstacles(self):
         """Analyze specific obstacles mentioned in 'Autres_obstacles' column"""
         if 'Autres_obstacles' not in self.df.columns:
             return {}
         
-        obstacle_mentions = {}
+        obstacles_text = self.df['Autres_obstacles'].dropna().astype(str)
+        obstacles_text = obstacles_text[(obstacles_text != '') & (obstacles_text != 'Inconnu')]
         
-        for obstacles_text in self.df['Autres_obstacles'].dropna():
-            if obstacles_text and obstacles_text != 'Inconnu':
-                # Split by common separators and clean
-                obstacles = re.split(r'[,;]', str(obstacles_text))
-                for obstacle in obstacles:
-                    obstacle = obstacle.strip()
-                    if obstacle and len(obstacle) > 3:  # Filter out very short entries
-                        obstacle_mentions[obstacle] = obstacle_mentions.get(obstacle, 0) + 1
+        # Split by common separators and clean
+        obstacles = obstacles_text.str.split(r'[,;]', regex=True).explode().str.strip()
+        obstacles = obstacles[obstacles.str.len() > 3]  # Filter out very short entries
         
-        # Sort by frequency
-        return dict(sorted(obstacle_mentions.items(), key=lambda x: x[1], reverse=True))
+        # Sorted by frequency
+        return obstacles.value_counts().to_dict()
     
     def analyze_training(self):
         """Analyze training received by companies"""
         if 'Formation_reçue' not in self.df.columns:
             return {}
         
-        results = {}
         training_types = ['BPH', 'BPF', 'HACCP', 'Aucune']
         
-        for training_type in training_types:
-            # Count companies that received this training
-            count = 0
-            total = 0
-            
-            for training_text in self.df['Formation_reçue']:
-                if pd.notna(training_text) and training_text != 'Inconnu':
-                    total += 1
-                    if training_type in str(training_text):
-                        count += 1
-            
-            if total > 0:
-                proportion = count / total
-                
-                # Exact binomial confidence interval
-                if count > 0:
-                    ci_lower, ci_upper = stats.binom.interval(0.95, total, proportion)
-                    ci_lower = ci_lower / total
-                    ci_upper = ci_upper / total
-                else:
-                    ci_lower = ci_upper = 0.0
-                
-                results[training_type] = {
-                    'count': count,
-                    'total': total,
-                    'proportion': proportion,
-                    'confidence_interval': (ci_lower, ci_upper)
-                }
+        # Known answers only
+        training = self.df['Formation_reçue']
+        training = training[training.notna() & (training != 'Inconnu')]
+        total = len(training)
         
-        return results
+        if total == 0:
+            return {}
+        
+        # Count companies that received each training
+        masks = compute_training_masks(training, training_types)
+        counts = [int(masks[training_type].sum()) for training_type in training_types]
+        
+        # Wilson score confidence intervals
+        intervals = _wilson_intervals(counts, total)
+        
+        return {
+            training_type: {
+                'count': count,
+                'total': total,
+                'proportion': count / total,
+                'confidence_interval': interval
+            }
+            for training_type, count, interval in zip(training_types, counts, intervals)
+        }
     
-    def calculate_hygiene_score(self, row):
-        """Calculate a composite hygiene score for a company"""
-        score = 0
-        total_practices = 0
-        
-        for practice in self.hygiene_practices:
-            if practice in row and pd.notna(row[practice]) and row[practice] != 'Inconnu':
-                total_practices += 1
-                if row[practice] == 'Oui':
-                    score += 1
-        
-        return score / total_practices if total_practices > 0 else 0
+    def calculate_hygiene_scores(self):
+        """Calculate the composite hygiene score of every row"""
+        return pd.Series(compute_hygiene_scores(self.hygiene_codes), index=self.df.index)
     
     def get_company_hygiene_scores(self):
         """Get hygiene scores for all companies"""
-        scores = {}
-        for _, row in self.df.iterrows():
-            company_id = row['ID_entreprise']
-            score = self.calculate_hygiene_score(row)
-            scores[company_id] = score
-        
-        return scores
+        scores = self.calculate_hygiene_scores()
+        return dict(zip(self.df['ID_entreprise'], scores.values))
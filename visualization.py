@@ -1,13 +1,13 @@
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import seaborn as sns
+
+from data_analysis import DataAnalyzer, compute_training_masks
 
 class HygieneVisualizer:
-    def __init__(self, df):
-        self.df = df.copy()
+    def __init__(self, df, analyzer=None):
+        self.df = df
+        self.analyzer = analyzer if analyzer is not None else DataAnalyzer(df)
         self.hygiene_practices = [
             'Existence_BPH', 'Existence_BPF', 'Existence_HACCP',
             'Procedures_ecrites', 'Formation_du_personnel_en_hygiene',
@@ -33,30 +33,25 @@ class HygieneVisualizer:
             'Non': '#DC143C',
             'Inconnu': '#FFA500'
         }
+        
+        # Company lookup table (first row per company, like the previous boolean filters)
+        self._by_id = self.df.drop_duplicates('ID_entreprise').set_index('ID_entreprise', drop=False)
+        
+        # Radar axes (practices present in the data and their labels)
+        self._radar_practices = [practice for practice in self.hygiene_practices if practice in self.df.columns]
+        self._radar_categories = [self.practice_labels.get(practice, practice) for practice in self._radar_practices]
+    
+    def get_company_data(self, company_id):
+        """Get the data row of a company"""
+        return self._by_id.loc[company_id]
     
     def create_company_radar(self, company_id):
         """Create a radar chart for a specific company"""
-        company_data = self.df[self.df['ID_entreprise'] == company_id].iloc[0]
-        
-        # Prepare data for radar chart
-        categories = []
-        values = []
-        colors = []
+        company_data = self.get_company_data(company_id)
         
-        for practice in self.hygiene_practices:
-            if practice in company_data:
-                categories.append(self.practice_labels.get(practice, practice))
-                value = company_data[practice]
-                
-                if value == 'Oui':
-                    values.append(1)
-                    colors.append(self.colors['Oui'])
-                elif value == 'Non':
-                    values.append(0)
-                    colors.append(self.colors['Non'])
-                else:
-                    values.append(0.5)  # Neutral value for unknown
-                    colors.append(self.colors['Inconnu'])
+        # Prepare data for radar chart (0.5 is the neutral value for unknown)
+        categories = self._radar_categories
+        values = company_data[self._radar_practices].map({'Oui': 1.0, 'Non': 0.0}).fillna(0.5).astype(float).to_numpy()
         
         fig = go.Figure()
         
@@ -138,22 +133,15 @@ class HygieneVisualizer:
         if 'Formation_reçue' not in self.df.columns:
             return go.Figure().add_annotation(text="Aucune donnée de formation disponible")
         
-        training_counts = {'BPH': 0, 'BPF': 0, 'HACCP': 0, 'Aucune': 0, 'Multiple': 0}
+        training = self.df['Formation_reçue'].dropna()
+        training = training[(training != '') & (training != 'Inconnu')]
         
-        for training_text in self.df['Formation_reçue'].dropna():
-            if training_text and training_text != 'Inconnu':
-                training_str = str(training_text)
-                individual_trainings = []
-                
-                for training_type in ['BPH', 'BPF', 'HACCP']:
-                    if training_type in training_str:
-                        individual_trainings.append(training_type)
-                        training_counts[training_type] += 1
-                
-                if 'Aucune' in training_str:
-                    training_counts['Aucune'] += 1
-                elif len(individual_trainings) > 1:
-                    training_counts['Multiple'] += 1
+        masks = compute_training_masks(training)
+        individual_trainings = masks[['BPH', 'BPF', 'HACCP']]
+        
+        training_counts = {training_type: int(count) for training_type, count in individual_trainings.sum().items()}
+        training_counts['Aucune'] = int(masks['Aucune'].sum())
+        training_counts['Multiple'] = int(((individual_trainings.sum(axis=1) > 1) & ~masks['Aucune']).sum())
         
         # Create pie chart
         fig = px.pie(
@@ -168,21 +156,19 @@ class HygieneVisualizer:
     def create_training_correlation_heatmap(self):
         """Create correlation heatmap between training and hygiene practices"""
         # Prepare data for correlation
-        correlation_data = pd.DataFrame()
-        
-        # Add training dummy variables
+        # Training dummy variables
         training_types = ['BPH', 'BPF', 'HACCP']
-        for training_type in training_types:
-            correlation_data[f'Formation_{training_type}'] = self.df['Formation_reçue'].apply(
-                lambda x: 1 if pd.notna(x) and training_type in str(x) else 0
-            )
-        
-        # Add hygiene practice dummy variables
-        for practice in self.hygiene_practices:
-            if practice in self.df.columns:
-                correlation_data[practice] = self.df[practice].apply(
-                    lambda x: 1 if x == 'Oui' else (0 if x == 'Non' else np.nan)
-                )
+        training_dummies = compute_training_masks(self.df['Formation_reçue'], training_types)
+        training_dummies = training_dummies.astype('int8').add_prefix('Formation_')
+        
+        # Hygiene practice dummy variables (NaN for unknown answers)
+        practice_dummies = [
+            self.df[practice].map({'Oui': 1, 'Non': 0}).astype('float32')
+            for practice in self.hygiene_practices
+            if practice in self.df.columns
+        ]
+        
+        correlation_data = pd.concat([training_dummies] + practice_dummies, axis=1)
         
         # Calculate correlation matrix
         corr_matrix = correlation_data.corr()
@@ -197,17 +183,15 @@ class HygieneVisualizer:
         
         fig.update_layout(
             width=800,
-            height=600
+            height=600,
+            hovermode='x'
         )
         
         return fig
     
     def create_company_comparison_chart(self):
         """Create a comparison chart of hygiene scores across companies"""
-        from data_analysis import DataAnalyzer
-        
-        analyzer = DataAnalyzer(self.df)
-        scores = analyzer.get_company_hygiene_scores()
+        scores = self.analyzer.get_company_hygiene_scores()
         
         if not scores:
             return go.Figure().add_annotation(text="Aucune donnée de score disponible")
@@ -216,10 +200,7 @@ class HygieneVisualizer:
         score_values = list(scores.values())
         
         # Add product type information
-        product_types = []
-        for company in companies:
-            product_type = self.df[self.df['ID_entreprise'] == company]['Type _de_produit'].iloc[0]
-            product_types.append(product_type)
+        product_types = self._by_id.loc[companies, 'Type _de_produit'].values
         
         fig = px.bar(
             x=companies,
@@ -232,78 +213,58 @@ class HygieneVisualizer:
         fig.update_layout(
             xaxis_title='Entreprise',
             yaxis_title='Score d\'hygiène',
-            yaxis=dict(range=[0, 1])
+            yaxis=dict(range=[0, 1]),
+            hovermode='x unified'
         )
         
         return fig
     
     def create_hygiene_boxplot(self):
         """Create boxplot for hygiene practices"""
-        # Prepare data for boxplot
-        plot_data = []
-        
-        for practice in self.hygiene_practices:
-            if practice in self.df.columns:
-                for _, row in self.df.iterrows():
-                    value = row[practice]
-                    if value in ['Oui', 'Non']:
-                        numerical_value = 1 if value == 'Oui' else 0
-                        plot_data.append({
-                            'Pratique': self.practice_labels.get(practice, practice),
-                            'Valeur': numerical_value,
-                            'Entreprise': row['ID_entreprise']
-                        })
-        
-        if not plot_data:
-            return go.Figure().add_annotation(text="Aucune donnée disponible pour le boxplot")
+        # Prepare long-form data for boxplot
+        practices = [practice for practice in self.hygiene_practices if practice in self.df.columns]
+        df_plot = self.df[['ID_entreprise'] + practices].melt(
+            id_vars='ID_entreprise', var_name='Pratique', value_name='Valeur'
+        )
+        df_plot['Valeur'] = df_plot['Valeur'].map({'Oui': 1, 'Non': 0})
+        df_plot = df_plot.dropna(subset=['Valeur']).rename(columns={'ID_entreprise': 'Entreprise'})
+        df_plot['Valeur'] = df_plot['Valeur'].astype(int)
+        df_plot['Pratique'] = df_plot['Pratique'].replace(self.practice_labels)
         
-        df_plot = pd.DataFrame(plot_data)
+        if df_plot.empty:
+            return go.Figure().add_annotation(text="Aucune donnée disponible pour le boxplot")
         
         fig = px.box(
             df_plot,
             x='Pratique',
             y='Valeur',
             title='Distribution des pratiques d\'hygiène',
-            points='all'
+            points='outliers'
         )
         
         fig.update_layout(
             xaxis_title='Pratique d\'hygiène',
             yaxis_title='Conformité (0=Non, 1=Oui)',
             yaxis=dict(tickvals=[0, 1], ticktext=['Non', 'Oui']),
-            xaxis_tickangle=-45
+            xaxis_tickangle=-45,
+            hovermode='x'
         )
         
         return fig
     
     def create_product_type_analysis(self):
         """Create analysis by product type"""
-        from data_analysis import DataAnalyzer
-        
-        analyzer = DataAnalyzer(self.df)
-        
-        # Calculate average hygiene scores by product type
-        product_scores = {}
-        
-        for product_type in self.df['Type _de_produit'].unique():
-            if pd.notna(product_type):
-                product_companies = self.df[self.df['Type _de_produit'] == product_type]
-                scores = []
-                
-                for _, row in product_companies.iterrows():
-                    score = analyzer.calculate_hygiene_score(row)
-                    if score > 0:  # Only include valid scores
-                        scores.append(score)
-                
-                if scores:
-                    product_scores[product_type] = np.mean(scores)
+        # Calculate average hygiene scores by product type (only valid scores)
+        scores = self.analyzer.calculate_hygiene_scores()
+        valid = scores > 0
+        product_scores = scores[valid].groupby(self.df['Type _de_produit'][valid], sort=False, observed=True).mean().dropna()
         
-        if not product_scores:
+        if product_scores.empty:
             return go.Figure().add_annotation(text="Aucune donnée disponible pour l'analyse par type de produit")
         
         fig = px.bar(
-            x=list(product_scores.values()),
-            y=list(product_scores.keys()),
+            x=product_scores.values,
+            y=product_scores.index,
             orientation='h',
             title='Score d\'hygiène moyen par type de produit',
             labels={'x': 'Score moyen', 'y': 'Type de produit'}